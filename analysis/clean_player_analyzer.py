@@ -15,9 +15,16 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import List, Optional
 
+import numpy as np
 import pandas as pd
 
-from .utils import calculate_potential_score
+from .utils import (
+    calculate_potential_scores,
+    downcast_numeric_columns,
+    load_csv_with_cache,
+    position_mask,
+    top_n_positions,
+)
 
 
 @dataclass
@@ -43,12 +50,26 @@ class CleanPlayerAnalyzer:
             raise FileNotFoundError("Standard data file not found")
 
         # The test data writes the MultiIndex to CSV; restoring it requires
-        # specifying the index columns explicitly.
-        self.standard_data = pd.read_csv(csv_path, index_col=[0, 1, 2, 3])
+        # specifying the index columns explicitly.  Repeat loads come from the
+        # Parquet copy written next to the CSV, which keeps the index and the
+        # narrowed dtypes intact.
+        self.standard_data = load_csv_with_cache(
+            csv_path, prepare=self._prepare_standard_data, index_col=[0, 1, 2, 3]
+        )
         self.data_dir = data_path
 
     # ------------------------------------------------------------------
     # Internal helpers
+    @staticmethod
+    def _prepare_standard_data(df: pd.DataFrame) -> pd.DataFrame:
+        # Narrow numeric dtypes to halve the bytes every filter and sort
+        # touches.  Only a handful of distinct positions exist, so position
+        # filters work on category codes rather than one string per player.
+        # The result is cached on disk: bump CSV_CACHE_VERSION when it changes.
+        df = downcast_numeric_columns(df)
+        df["position"] = df["position"].astype("category")
+        return df
+
     def _check_loaded(self) -> pd.DataFrame:
         if self.standard_data is None:
             raise ValueError("No data loaded")
@@ -69,14 +90,20 @@ class CleanPlayerAnalyzer:
         """
 
         df = self._check_loaded()
-        result = df[df.index.get_level_values("player").str.contains(name, case=False)]
-
+        # Build one boolean mask over the index level and column arrays and
+        # index the frame once, instead of materialising a frame per filter.
+        mask = np.asarray(
+            df.index.get_level_values("player").str.contains(
+                name, case=False, na=False
+            ),
+            dtype=bool,
+        )
         if position is not None:
-            result = result[result["position"].str.contains(position, case=False)]
+            mask &= position_mask(df["position"], position)
         if min_minutes is not None:
-            result = result[result["minutes"] >= min_minutes]
+            mask &= df["minutes"].to_numpy() >= min_minutes
 
-        return result
+        return df[mask]
 
     def compare_players(self, players: List[str]) -> pd.DataFrame:
         """Return rows for the given ``players``.
@@ -84,8 +111,11 @@ class CleanPlayerAnalyzer:
         Raises ``ValueError`` if none of the players are present.
         """
 
-        df = self._check_loaded().reset_index()
-        result = df[df["player"].isin(players)]
+        df = self._check_loaded()
+        # Match on the player index level directly and only flatten the
+        # matching rows, rather than resetting the index of the whole frame.
+        mask = df.index.get_level_values("player").isin(players)
+        result = df[mask].reset_index()
 
         if result.empty:
             raise ValueError("No players found from the provided list")
@@ -94,7 +124,7 @@ class CleanPlayerAnalyzer:
 
     def get_players_by_position(self, position: str) -> pd.DataFrame:
         df = self._check_loaded()
-        return df[df["position"].str.contains(position, case=False)]
+        return df[position_mask(df["position"], position)]
 
     def get_position_leaders(
         self, position: str, stat: str, top_n: int = 5
@@ -104,22 +134,32 @@ class CleanPlayerAnalyzer:
         if stat not in df.columns:
             raise ValueError(f"Stat '{stat}' not found")
 
-        pos_df = df[df["position"].str.contains(position, case=False)]
-        return pos_df.sort_values(stat, ascending=False).head(top_n)
+        pos_df = df[position_mask(df["position"], position)]
+        if not pd.api.types.is_numeric_dtype(pos_df[stat]):
+            return pos_df.sort_values(stat, ascending=False).head(top_n)
+
+        # Only the leaders are needed, so select them with a partial sort
+        return pos_df.iloc[top_n_positions(pos_df[stat].to_numpy(), top_n)]
 
     def get_young_prospects(
         self, max_age: int = 23, min_minutes: int = 1000
     ) -> pd.DataFrame:
         df = self._check_loaded()
-        prospects = df[(df["age"] < max_age) & (df["minutes"] >= min_minutes)].copy()
+        # Both thresholds are combined into a single mask over the raw column
+        # arrays and the scores are computed for the surviving rows in one
+        # vectorised pass, so only the final prospect frame is materialised.
+        mask = (df["age"].to_numpy() < max_age) & (
+            df["minutes"].to_numpy() >= min_minutes
+        )
+        prospects = df[mask]
 
         if prospects.empty:
             return prospects
 
-        prospects["potential_score"] = prospects.apply(
-        lambda row: calculate_potential_score(row), axis=1
+        scores = calculate_potential_scores(prospects)
+        return prospects.assign(potential_score=scores).sort_values(
+            "potential_score", ascending=False
         )
-        return prospects.sort_values("potential_score", ascending=False)
 
     # ------------------------------------------------------------------
     @property
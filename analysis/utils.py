@@ -7,8 +7,20 @@ used across different analysis modules.
 
 import pandas as pd
 import numpy as np
+import hashlib
 import logging
-from typing import Dict, List, Optional, Tuple
+import os
+import re
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Version of the Parquet copies written by load_csv_with_cache. Bump it
+# whenever a ``prepare`` step (or a helper it calls) or the cache layout
+# changes, so existing caches are rebuilt.
+CSV_CACHE_VERSION = 1
 
 # Configuration for potential scoring algorithm
 POTENTIAL_SCORING_WEIGHTS = {
@@ -22,6 +34,18 @@ POTENTIAL_SCORING_WEIGHTS = {
     'age_factor': 10.0  # Multiplied by (23 - age) for young players
 }
 
+# Columns needed to compute a potential score
+POTENTIAL_REQUIRED_COLUMNS = [
+    'age', 'goals_per_90', 'assists_per_90', 'progressive_carries',
+    'progressive_passes', 'expected_goals', 'expected_assists', 'minutes'
+]
+
+# Columns that contribute linearly (column * weight) to the potential score
+POTENTIAL_LINEAR_COLUMNS = [
+    'progressive_carries', 'progressive_passes', 'minutes',
+    'expected_goals', 'expected_assists'
+]
+
 # Position filters for different analyses
 POSITION_FILTERS = {
     'defensive_midfielder': {
@@ -91,10 +115,7 @@ def calculate_potential_score(player_row: pd.Series,
     if weights is None:
         weights = POTENTIAL_SCORING_WEIGHTS
     
-    required_cols = ['age', 'goals_per_90', 'assists_per_90', 'progressive_carries', 
-                    'progressive_passes', 'expected_goals', 'expected_assists', 'minutes']
-    
-    missing_cols = [col for col in required_cols if col not in player_row.index]
+    missing_cols = [col for col in POTENTIAL_REQUIRED_COLUMNS if col not in player_row.index]
     if missing_cols:
         raise ValueError(f"Missing required columns: {missing_cols}")
     
@@ -117,6 +138,97 @@ def calculate_potential_score(player_row: pd.Series,
     return score
 
 
+def calculate_potential_scores(df: pd.DataFrame,
+                               weights: Optional[Dict[str, float]] = None,
+                               max_age: int = 23) -> np.ndarray:
+    """
+    Calculate potential scores for every row of a player DataFrame.
+    
+    Vectorised counterpart of calculate_potential_score: the weighted sum is
+    evaluated once over the column arrays instead of once per row.
+    
+    Args:
+        df: Player data with one row per player
+        weights: Custom weights dict, uses default if None
+        max_age: Maximum age for age factor calculation
+        
+    Returns:
+        Array of potential scores aligned with the rows of df
+        
+    Raises:
+        ValueError: If required columns are missing
+    """
+    if weights is None:
+        weights = POTENTIAL_SCORING_WEIGHTS
+    
+    missing_cols = [col for col in POTENTIAL_REQUIRED_COLUMNS if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Missing required columns: {missing_cols}")
+    
+    # The linear terms are a single matrix-vector product over one 2-D block
+    # of the stat columns; only the clipped age bonus is computed separately.
+    stats = df[POTENTIAL_LINEAR_COLUMNS].to_numpy(dtype=np.float64)
+    stat_weights = np.array([weights[col] for col in POTENTIAL_LINEAR_COLUMNS])
+    
+    # Players at or above max_age get no age bonus
+    ages = df['age'].to_numpy(dtype=np.float64)
+    age_factor = np.clip(max_age - ages, 0, None) * weights['age_factor']
+    
+    return stats @ stat_weights + age_factor
+
+
+def position_mask(positions: pd.Series, position: str) -> np.ndarray:
+    """
+    Build a boolean mask of players whose position contains a substring.
+    
+    The match is case-insensitive and literal. For categorical columns the
+    substring test runs once per category and rows are resolved through
+    their integer codes, avoiding a string comparison per row.
+    
+    Args:
+        positions: Position column, object or categorical dtype
+        position: Substring to look for, e.g. 'Midfielder'
+        
+    Returns:
+        Boolean array aligned with positions; missing values never match
+    """
+    if isinstance(positions.dtype, pd.CategoricalDtype):
+        matches = positions.cat.categories.str.contains(position, case=False, regex=False)
+        # Missing values have code -1, which picks the trailing False
+        lookup = np.append(np.asarray(matches, dtype=bool), False)
+        return lookup[positions.cat.codes.to_numpy()]
+    
+    return positions.str.contains(position, case=False, na=False, regex=False).to_numpy(dtype=bool)
+
+
+def top_n_positions(values: np.ndarray, n: int) -> np.ndarray:
+    """
+    Find the positions of the n largest values, largest first.
+    
+    Uses a partial partition to select the top n in linear time and only
+    sorts those n, instead of sorting every value. NaN values rank last,
+    matching ``sort_values(ascending=False)``.
+    
+    Args:
+        values: Numeric values to rank
+        n: Number of positions to return
+        
+    Returns:
+        Integer positions into values, ordered by descending value
+    """
+    negated = -np.asarray(values, dtype=np.float64)
+    n = max(0, min(n, len(negated)))
+    
+    if n == 0:
+        return np.empty(0, dtype=np.intp)
+    if n < len(negated):
+        candidates = np.argpartition(negated, n - 1)[:n]
+    else:
+        candidates = np.arange(len(negated))
+    
+    return candidates[np.argsort(negated[candidates], kind='stable')]
+
+
 def filter_midfielders(df: pd.DataFrame, 
                       min_minutes: int = 500,
                       attacking: bool = False,
@@ -139,26 +251,27 @@ def filter_midfielders(df: pd.DataFrame,
     if attacking and defensive:
         raise ValueError("Cannot filter for both attacking and defensive simultaneously")
     
-    # Base filter for midfielders with minimum minutes
-    filtered_df = df[
-        (df['position'].str.contains('Midfielder', case=False, na=False)) &
-        (df['minutes'] >= min_minutes)
-    ]
+    # All criteria are combined into one boolean mask over the column
+    # arrays, so the frame is only indexed (and copied) once
+    mask = (
+        position_mask(df['position'], 'Midfielder') &
+        (df['minutes'].to_numpy() >= min_minutes)
+    )
     
     if attacking:
         filters = POSITION_FILTERS['attacking_midfielder']
-        filtered_df = filtered_df[
-            (filtered_df['goals_per_90'] >= filters['goals_per_90_min']) |
-            (filtered_df['assists_per_90'] >= filters['assists_per_90_min'])
-        ]
+        mask &= (
+            (df['goals_per_90'].to_numpy() >= filters['goals_per_90_min']) |
+            (df['assists_per_90'].to_numpy() >= filters['assists_per_90_min'])
+        )
     elif defensive:
         filters = POSITION_FILTERS['defensive_midfielder']
-        filtered_df = filtered_df[
-            (filtered_df['goals_per_90'] <= filters['goals_per_90_max']) &
-            (filtered_df['assists_per_90'] <= filters['assists_per_90_max'])
-        ]
+        mask &= (
+            (df['goals_per_90'].to_numpy() <= filters['goals_per_90_max']) &
+            (df['assists_per_90'].to_numpy() <= filters['assists_per_90_max'])
+        )
     
-    return filtered_df
+    return df[mask]
 
 
 def filter_by_position(df: pd.DataFrame, 
@@ -184,23 +297,130 @@ def filter_by_position(df: pd.DataFrame,
     
     filters = POSITION_FILTERS[position_type]
     
-    # Base filter
-    filtered_df = df[
-        (df['position'].str.contains(filters['position_contains'], case=False, na=False)) &
-        (df['minutes'] >= min_minutes)
-    ]
+    # Base filter, extended in place by any thresholds the position defines
+    mask = (
+        position_mask(df['position'], filters['position_contains']) &
+        (df['minutes'].to_numpy() >= min_minutes)
+    )
     
-    # Apply additional filters if they exist
     if 'goals_per_90_max' in filters:
-        filtered_df = filtered_df[filtered_df['goals_per_90'] <= filters['goals_per_90_max']]
+        mask &= df['goals_per_90'].to_numpy() <= filters['goals_per_90_max']
     if 'goals_per_90_min' in filters:
-        filtered_df = filtered_df[filtered_df['goals_per_90'] >= filters['goals_per_90_min']]
+        mask &= df['goals_per_90'].to_numpy() >= filters['goals_per_90_min']
     if 'assists_per_90_max' in filters:
-        filtered_df = filtered_df[filtered_df['assists_per_90'] <= filters['assists_per_90_max']]
+        mask &= df['assists_per_90'].to_numpy() <= filters['assists_per_90_max']
     if 'assists_per_90_min' in filters:
-        filtered_df = filtered_df[filtered_df['assists_per_90'] >= filters['assists_per_90_min']]
+        mask &= df['assists_per_90'].to_numpy() >= filters['assists_per_90_min']
+    
+    return df[mask]
+
+
+def downcast_numeric_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink numeric columns to narrower dtypes in place.
+    
+    Integer columns are reduced to the smallest integer type that holds
+    their values and float columns to float32, which at least halves the
+    bytes filters and sorts have to move.
+    
+    Args:
+        df: DataFrame to modify
+        
+    Returns:
+        The same DataFrame, for chaining
+    """
+    for col in df.select_dtypes(include='integer').columns:
+        df[col] = pd.to_numeric(df[col], downcast='integer')
+    for col in df.select_dtypes(include='floating').columns:
+        df[col] = df[col].astype(np.float32)
+    return df
+
+
+def _csv_cache_fingerprint(csv_path: Path,
+                           prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]],
+                           read_csv_kwargs: Dict) -> str:
+    """Short hash identifying the CSV version and the loading options behind a cache"""
+    stat = csv_path.stat()
+    parts = [
+        str(CSV_CACHE_VERSION),
+        str(stat.st_mtime_ns),
+        str(stat.st_size),
+        repr(sorted(read_csv_kwargs.items())),
+    ]
+    if prepare is not None:
+        parts.append(f"{prepare.__module__}.{prepare.__qualname__}")
+    return hashlib.blake2b('\n'.join(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _write_csv_cache(df: pd.DataFrame, cache_path: Path, stem: str) -> None:
+    """Atomically write a Parquet cache, then drop older caches of the same CSV"""
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{cache_path.name}.", suffix='.tmp',
+                                    dir=cache_path.parent)
+    os.close(fd)
+    try:
+        df.to_parquet(tmp_name)
+        # Readers see either the previous state or the complete file, never
+        # a partial write from a crash or a concurrent worker
+        os.replace(tmp_name, cache_path)
+    finally:
+        if os.path.exists(tmp_name):
+            os.remove(tmp_name)
+    
+    stale = re.compile(rf"{re.escape(stem)}(\.[0-9a-f]{{16}})?\.parquet")
+    for sibling in cache_path.parent.glob(f"{stem}*.parquet"):
+        if sibling != cache_path and stale.fullmatch(sibling.name):
+            try:
+                sibling.unlink()
+            except OSError as e:
+                logger.debug("Could not remove stale cache %s: %s", sibling, e)
+
+
+def load_csv_with_cache(csv_path: Union[str, Path],
+                        prepare: Optional[Callable[[pd.DataFrame], pd.DataFrame]] = None,
+                        **read_csv_kwargs) -> pd.DataFrame:
+    """
+    Load a CSV file, reusing a Parquet copy stored next to it when possible.
     
-    return filtered_df
+    The first load parses the CSV and writes ``<name>.<fingerprint>.parquet``
+    alongside it. Later loads read the Parquet file instead, which skips CSV
+    parsing and dtype inference. The fingerprint covers the CSV's mtime and
+    size, ``read_csv_kwargs``, the ``prepare`` function's name and
+    ``CSV_CACHE_VERSION``, so an edited CSV or different loading options
+    never reuse an old cache. Caches from earlier fingerprints are deleted
+    when a new one is written. Parquet support needs pyarrow; without it (or
+    if the cache cannot be read or written) this behaves exactly like
+    ``pd.read_csv``.
+    
+    Args:
+        csv_path: Path to the source CSV file
+        prepare: Optional transform applied to the parsed CSV before it is
+            cached, e.g. dtype conversion, so cached loads skip it. Bump
+            ``CSV_CACHE_VERSION`` when its output changes.
+        **read_csv_kwargs: Extra arguments passed to ``pd.read_csv``
+        
+    Returns:
+        Loaded DataFrame
+    """
+    csv_path = Path(csv_path)
+    fingerprint = _csv_cache_fingerprint(csv_path, prepare, read_csv_kwargs)
+    cache_path = csv_path.with_name(f"{csv_path.stem}.{fingerprint}.parquet")
+    
+    if cache_path.exists():
+        try:
+            return pd.read_parquet(cache_path)
+        except (ImportError, OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable cache %s: %s", cache_path, e)
+    
+    df = pd.read_csv(csv_path, **read_csv_kwargs)
+    if prepare is not None:
+        df = prepare(df)
+    
+    try:
+        _write_csv_cache(df, cache_path, csv_path.stem)
+    except (ImportError, OSError, ValueError) as e:
+        logger.debug("Could not write cache %s: %s", cache_path, e)
+    
+    return df
 
 
 def flatten_multiindex_columns(df: pd.DataFrame) -> pd.DataFrame:
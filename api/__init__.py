@@ -5,11 +5,18 @@ Pure AI-first architecture for professional-grade soccer intelligence.
 Uses GPT-4 powered 3-step pipeline: Parser → Analysis → Reasoning
 """
 
-from .ai_native_api import RevolutionaryAIAPI, create_revolutionary_api
-
 __all__ = [
     'RevolutionaryAIAPI',
     'create_revolutionary_api'
 ]
 
-__version__ = '2.0.0-revolutionary'
\ No newline at end of file
+__version__ = '2.0.0-revolutionary'
+
+
+def __getattr__(name):
+    # Import the AI engine on first use so that importing a submodule such as
+    # api.main_api does not pay for (or depend on) the full AI stack
+    if name in __all__:
+        from . import ai_native_api
+        return getattr(ai_native_api, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -10,6 +10,7 @@ without requiring external services such as OpenAI.
 from __future__ import annotations
 
 from dataclasses import dataclass
+from functools import lru_cache
 from typing import Any, Dict, List
 
 
@@ -105,10 +106,22 @@ class SoccerAnalyticsAPI:
         }
 
 
-def quick_query(query: str) -> str:
-    """Convenience wrapper used in tests."""
+@lru_cache(maxsize=1)
+def _default_api() -> SoccerAnalyticsAPI:
+    """Process-wide API instance shared by :func:`quick_query`."""
 
-    api = SoccerAnalyticsAPI()
+    return SoccerAnalyticsAPI()
+
+
+def quick_query(query: str, api: SoccerAnalyticsAPI | None = None) -> str:
+    """Convenience wrapper used in tests.
+
+    ``api`` lets callers that already hold an instance reuse it; otherwise a
+    single default instance is created on first use and shared by later calls.
+    """
+
+    if api is None:
+        api = _default_api()
     response = api.query(query)
     return api.format_for_chat(response)
 
@@ -11,7 +11,9 @@ backlog = 2048
 
 # Worker processes
 workers = 1  # Railway has memory limits, keep this low
-worker_class = "sync"
+# Threads let one worker keep serving while other requests wait on OpenAI I/O
+worker_class = "gthread"
+threads = int(os.environ.get('GUNICORN_THREADS', '8'))
 worker_connections = 1000
 timeout = 55  # Railway timeout optimization - must be under 60s
 keepalive = 2
@@ -29,7 +31,8 @@ access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(r)s" %(s)s %(b)s "%(f)s" "%(a)s"
 # Process naming
 proc_name = "soccer-scout-api"
 
-# Preload app for better memory usage
+# Preload app for better memory usage: the master loads the player data once
+# and workers fork with it, so max_requests restarts do not reload the data
 preload_app = True
 
 # Print configuration for debugging
@@ -3,25 +3,31 @@
 Simplified Soccer Scout API - Clean Two-Stage AI Architecture
 
 A reliable, simplified backend that:
-1. Uses GPT-5-nano to parse queries into simple filters
+1. Uses a light OpenAI model (PARSER_MODEL) to parse queries into simple filters
 2. Filters the player database efficiently 
-3. Uses GPT-5-mini to generate conversational scout insights
+3. Uses the analysis model (ANALYSIS_MODEL) to generate conversational scout insights
 
 No JSON parsing issues, no over-engineering, just reliable AI-powered scouting.
 """
 
 import os
 import time
+import hashlib
 import logging
+import threading
 import pandas as pd
 import numpy as np
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 from openai import OpenAI
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+from collections import OrderedDict
+from concurrent.futures import Future
 import re
 
+from analysis.utils import load_csv_with_cache, position_mask
+
 # Load environment variables from .env file
 try:
     from dotenv import load_dotenv
@@ -36,6 +42,224 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Maximum number of analysis results kept in the in-memory LRU cache
+RESULT_CACHE_SIZE = 128
+
+# OpenAI models per stage: a light model for filter extraction, the
+# analysis model for the scout write-up
+PARSER_MODEL = os.getenv('PARSER_MODEL', 'gpt-4o-mini')
+ANALYSIS_MODEL = os.getenv('ANALYSIS_MODEL', 'gpt-4o-mini')
+
+# Parser instructions, kept byte-identical across calls so the provider can
+# reuse the prompt prefix; only the query goes in the user message
+PARSER_SYSTEM_PROMPT = """You are a query parser. Parse soccer queries into simple filter criteria.
+Extract ONLY what's explicitly mentioned. Return simple key-value pairs, no JSON.
+
+Extract these if mentioned:
+- position: MUST be one of: "Midfielder", "Forward", "Defender", "Goalkeeper"
+  (Map common terms: DM/CDM/CM/CAM → Midfielder, ST/CF/Winger → Forward, CB/LB/RB → Defender, GK → Goalkeeper)
+  
+- league: MUST be one of: "ENG-Premier League", "ESP-La Liga", "ITA-Serie A", "GER-Bundesliga", "FRA-Ligue 1"
+  (Map variations: England/EPL/Prem → ENG-Premier League, Spain → ESP-La Liga, Italy → ITA-Serie A, 
+   Germany/Buli → GER-Bundesliga, France/L1 → FRA-Ligue 1)
+  
+- age_max: (number - for "under X", "U21", "young")
+- age_min: (number - for "over X", "veteran")
+- min_minutes: (number, default 500 if not specified)
+- style: (creative, defensive, fast)
+- similar_to: (exact player name if comparing)
+
+Example output:
+position: Midfielder
+league: FRA-Ligue 1
+age_max: 21
+style: defensive
+
+Only include fields that are clearly mentioned in the query."""
+
+# Fixed scout instructions; the per-query candidates go in the user message
+ANALYSIS_SYSTEM_PROMPT = """You are an expert soccer scout providing clear, concise analysis.
+
+Provide a conversational response that:
+1. Directly answers the user's question
+2. Recommends the top 2-3 players with brief reasoning
+3. Mentions any standout insights or concerns
+4. Keeps it concise and professional
+
+Do not use JSON or structured formats. Write naturally as if talking to a coach."""
+
+# Maximum number of LLM-parsed filter sets kept; parses do not depend on data
+PARSER_CACHE_SIZE = 512
+
+# Seconds a cached analysis stays valid; failures expire sooner
+RESULT_CACHE_TTL = 300.0
+FAILED_RESULT_CACHE_TTL = 30.0
+
+# Words that signal a tactical or comparative query the keyword parser cannot capture
+TACTICAL_KEYWORDS = frozenset({
+    'press', 'pressing', 'block', 'overload', 'system', 'formation', 'tactical',
+    'tactics', 'role', 'partner', 'alongside', 'fit', 'suit', 'compare', 'vs',
+    'versus', 'similar', 'replacement', 'replace', 'alternative', 'undervalued'
+})
+
+# Queries scoring at or above this are parsed by the LLM, the rest by keywords
+AI_PARSER_THRESHOLD = 0.6
+
+# Score column each playing style is filtered on
+STYLE_SCORE_COLUMNS = {
+    'creative': 'creativity_score',
+    'defensive': 'defensive_work_rate'
+}
+
+# Query terms recognised by the keyword parser, checked in order as whole words
+POSITION_TERMS = {
+    # Midfielders
+    'midfielder': 'Midfielder',
+    'midfield': 'Midfielder',
+    'mid': 'Midfielder',
+    'cm': 'Midfielder',
+    'cdm': 'Midfielder',
+    'cam': 'Midfielder',
+    'dm': 'Midfielder',
+    'defensive midfielder': 'Midfielder',
+    'attacking midfielder': 'Midfielder',
+    'central midfielder': 'Midfielder',
+    'box to box': 'Midfielder',
+    'playmaker': 'Midfielder',
+    
+    # Forwards
+    'forward': 'Forward',
+    'striker': 'Forward',
+    'attacker': 'Forward',
+    'cf': 'Forward',
+    'st': 'Forward',
+    'winger': 'Forward',
+    'wing': 'Forward',
+    'lw': 'Forward',
+    'rw': 'Forward',
+    'left winger': 'Forward',
+    'right winger': 'Forward',
+    
+    # Defenders
+    'defender': 'Defender',
+    'defense': 'Defender',
+    'defence': 'Defender',
+    'cb': 'Defender',
+    'center back': 'Defender',
+    'centre back': 'Defender',
+    'fullback': 'Defender',
+    'full back': 'Defender',
+    'lb': 'Defender',
+    'rb': 'Defender',
+    'left back': 'Defender',
+    'right back': 'Defender',
+    'wing back': 'Defender',
+    'wingback': 'Defender',
+    
+    # Goalkeeper
+    'goalkeeper': 'Goalkeeper',
+    'keeper': 'Goalkeeper',
+    'gk': 'Goalkeeper',
+    'goalie': 'Goalkeeper'
+}
+
+LEAGUE_TERMS = {
+    # Premier League variations
+    'premier league': 'ENG-Premier League',
+    'epl': 'ENG-Premier League',
+    'pl': 'ENG-Premier League',
+    'england': 'ENG-Premier League',
+    'english': 'ENG-Premier League',
+    'prem': 'ENG-Premier League',
+    
+    # La Liga variations
+    'la liga': 'ESP-La Liga',
+    'laliga': 'ESP-La Liga',
+    'spain': 'ESP-La Liga',
+    'spanish': 'ESP-La Liga',
+    'liga': 'ESP-La Liga',
+    
+    # Serie A variations
+    'serie a': 'ITA-Serie A',
+    'seriea': 'ITA-Serie A',
+    'italy': 'ITA-Serie A',
+    'italian': 'ITA-Serie A',
+    'serie': 'ITA-Serie A',
+    
+    # Bundesliga variations
+    'bundesliga': 'GER-Bundesliga',
+    'germany': 'GER-Bundesliga',
+    'german': 'GER-Bundesliga',
+    'buli': 'GER-Bundesliga',
+    
+    # Ligue 1 variations
+    'ligue 1': 'FRA-Ligue 1',
+    'ligue1': 'FRA-Ligue 1',
+    'france': 'FRA-Ligue 1',
+    'french': 'FRA-Ligue 1',
+    'ligue': 'FRA-Ligue 1',
+    'l1': 'FRA-Ligue 1'
+}
+
+STYLE_TERMS = {
+    'creative': 'creative',
+    'playmaker': 'creative',
+    'technical': 'creative',
+    'defensive': 'defensive',
+    'destroyer': 'defensive',
+    'physical': 'defensive',
+    'fast': 'fast',
+    'pace': 'fast',
+    'quick': 'fast',
+    'speedy': 'fast'
+}
+
+# An age in a query: a number of at most two digits that is not a count of
+# minutes or games ("over 2000 minutes", "under 30 games")
+AGE_NUMBER = r'(\d{1,2})\b(?! (?:minutes|mins|min|games|matches|appearances|apps)\b)'
+
+# Largest number the keyword parser accepts as an age
+MAX_QUERY_AGE = 45
+
+# Age clauses, tried in order; the first that matches sets the age filter
+AGE_PATTERNS = [
+    (re.compile(rf'\bunder {AGE_NUMBER}'), 'age_max'),
+    (re.compile(rf'\bu ?{AGE_NUMBER}'), 'age_max'),
+    (re.compile(rf'\byounger than {AGE_NUMBER}'), 'age_max'),
+    (re.compile(rf'\bover {AGE_NUMBER}'), 'age_min'),
+    (re.compile(rf'\bolder than {AGE_NUMBER}'), 'age_min'),
+    (re.compile(r'\b(\d{1,2}) years old'), 'age_exact'),
+    (re.compile(rf'\bage {AGE_NUMBER}'), 'age_exact')
+]
+
+# Words and characters carrying constraints the keyword parser cannot
+# express; queries containing any of them always go to the LLM parser
+UNPARSED_CONSTRAINT_PATTERN = re.compile(
+    r'[<>=+≤≥]|\b(?:'
+    r'minutes?|mins?|games?|matches|appearances?|apps|'
+    r'veterans?|experienced|teen\w*|between|aged|born|'
+    r'not|no|non|outside|except|excluding|without'
+    r')\b'
+)
+
+# League names containing a number, which is not a stray constraint
+NUMBERED_LEAGUE_TERMS = [term for term in LEAGUE_TERMS if re.search(r'\b\d+\b', term)]
+STRAY_NUMBER_PATTERN = re.compile(r'\b\d+\b')
+
+# "<keyword> <player name>" anchors, capturing the name up to "in"/"for"
+SIMILAR_PLAYER_PATTERNS = [
+    re.compile(rf"\b{keyword}\s+([\w\s]+?)(?:\s+in\s+|\s+for\s+|$)")
+    for keyword in ('similar to', 'like', 'replacement for', 'alternative to')
+]
+
+# Query tokens kept by normalisation: words, plus comparison characters
+# that change what a query asks for
+QUERY_TOKEN_PATTERN = re.compile(r'\w+|[<>=+≤≥]')
+
+# Young-player words, matched as word prefixes so "youngsters" and
+# "talented" count as well
+YOUNG_PATTERN = re.compile(r'\b(?:young|prospect|talent|wonderkid)')
+
 # Create Flask app
 app = Flask(__name__)
 
@@ -56,92 +280,138 @@ class SimpleScoutAI:
         """Initialize the scout with OpenAI client and player data"""
         self.client = OpenAI(api_key=openai_api_key)
         self.players_df = None
+        self.league_rows = {}
+        self.position_masks = {}
+        
+        # LRU cache of analyses with expiry, keyed by query. Requests are
+        # served from several threads, so every access holds the lock.
+        self.result_cache = OrderedDict()
+        self.cache_lock = threading.Lock()
+        self.in_flight = {}  # cache key -> Future of an analysis being computed
+        self.parser_cache = OrderedDict()  # cache key -> LLM-parsed filters
+        
         self.load_player_data()
         
     def load_player_data(self):
         """Load the comprehensive player database"""
         logger.info("Loading player database...")
         try:
-            # Load the unified player data
+            # Load the unified player data, from its Parquet copy when one
+            # exists. Under gunicorn the master loads this once (preload_app)
+            # and workers fork from it, so worker restarts never reach here;
+            # the copy only speeds up a cold start of the whole server on a
+            # filesystem that kept the file, such as local or dev runs.
             data_path = "data/comprehensive/processed/unified_player_data.csv"
-            self.players_df = pd.read_csv(data_path)
+            self.players_df = load_csv_with_cache(data_path)
             
             # Add computed metrics for better analysis
             self._enhance_player_data()
             
-            logger.info(f"✅ Loaded {len(self.players_df)} players with {len(self.players_df.columns)} metrics")
+            # Keep the database ordered by overall rating. Filtering preserves
+            # row order, so every filtered result comes out already ranked
+            # and requests never have to sort.
+            self.players_df = self.players_df.sort_values(
+                'overall_rating', ascending=False, kind='stable', ignore_index=True
+            )
+
+            # Only a handful of distinct leagues and positions exist, so store
+            # them as categories: grouping and position matching work on
+            # integer codes rather than one string per player
+            for name in ('league', 'position'):
+                self.players_df[name] = self.players_df[name].astype('category')
+
+            # Row positions of each league, grouped once so league filters
+            # become a direct lookup instead of a scan over every player
+            self.league_rows = self.players_df.groupby('league', sort=False, observed=True).indices
+            
+            # Masks for the canonical positions the parsers produce, so a
+            # position filter is a lookup instead of a string scan
+            self.position_masks = {
+                position.lower(): position_mask(self.players_df['position'], position)
+                for position in set(POSITION_TERMS.values())
+            }
+            
+            logger.info("✅ Loaded %s players with %s metrics", len(self.players_df), len(self.players_df.columns))
         except Exception as e:
-            logger.error(f"❌ Failed to load player data: {e}")
+            logger.error("❌ Failed to load player data: %s", e)
             raise
     
     def _enhance_player_data(self):
         """Add computed metrics for AI analysis"""
+        df = self.players_df
+        
+        # Pull each source column once as a NaN-free array. NaN values count
+        # as 0; a column that is absent altogether contributes `missing`.
+        def column(name, missing=0.0):
+            if name not in df.columns:
+                return np.full(len(df), missing)
+            return df[name].fillna(0.0).to_numpy(dtype=np.float64)
+        
         # Safe division helper
         def safe_per_90(stat_col, nineties_col):
-            return np.where(nineties_col > 0, stat_col / nineties_col, 0)
+            return np.divide(stat_col, nineties_col,
+                             out=np.zeros_like(stat_col), where=nineties_col > 0)
+        
+        goals_per_90 = column('goals_per_90')
+        assists_per_90 = column('assists_per_90')
         
         # Defensive work rate
-        self.players_df['defensive_work_rate'] = safe_per_90(
-            self.players_df.get('tackles', 0) + self.players_df.get('tackles_won', 0),
-            self.players_df.get('nineties', 1)
+        defensive_work_rate = safe_per_90(
+            column('tackles') + column('tackles_won'),
+            column('nineties', 1.0)
         )
+        df['defensive_work_rate'] = defensive_work_rate
         
         # Creativity score (simple version)
-        self.players_df['creativity_score'] = (
-            self.players_df.get('assists_per_90', 0) * 2 +
-            self.players_df.get('expected_assists_per_90', 0)
-        )
+        df['creativity_score'] = assists_per_90 * 2 + column('expected_assists_per_90')
         
         # Overall rating (simple aggregation)
-        self.players_df['overall_rating'] = (
-            self.players_df.get('goals_per_90', 0) * 3 +
-            self.players_df.get('assists_per_90', 0) * 2 +
-            self.players_df.get('defensive_work_rate', 0)
-        )
+        df['overall_rating'] = goals_per_90 * 3 + assists_per_90 * 2 + defensive_work_rate
+    
+    @staticmethod
+    def _column_labels(df: pd.DataFrame, name: str, spec: str) -> List[str]:
+        """
+        Display text for a numeric column, formatted with a format spec.
+        Missing values read 'n/a'; an absent column counts as zeros.
+        """
+        if name not in df.columns:
+            return [format(0.0, spec)] * len(df)
+        values = df[name].to_numpy(dtype=np.float64)
+        return [format(value, spec) if value == value else "n/a" for value in values]
     
-    def parse_query_to_filters(self, query: str) -> Dict[str, Any]:
+    def parse_query_to_filters(self, query: str,
+                               cache_key: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
         """
-        Stage 1: Use GPT-5-nano to parse natural language into simple filters
-        Returns a dictionary of filter criteria, not complex JSON
+        Stage 1: Use PARSER_MODEL to parse natural language into simple filters
+        Returns a dictionary of filter criteria, not complex JSON, and whether
+        the keyword parser had to stand in for a failed LLM call
         """
-        logger.info(f"🧠 Stage 1: Parsing query with GPT-5-nano")
+        keyword_filters = self._fallback_parser(query)
+        if not self._needs_ai_parser(query, keyword_filters):
+            logger.info("⚡ Stage 1: Simple query, using keyword parser: %s", keyword_filters)
+            return keyword_filters, False
+        
+        if cache_key is None:
+            cache_key = self._cache_key(query)
+        with self.cache_lock:
+            cached_filters = self.parser_cache.get(cache_key)
+            if cached_filters is not None:
+                self.parser_cache.move_to_end(cache_key)
+        if cached_filters is not None:
+            logger.info("⚡ Stage 1: Reusing parsed filters: %s", cached_filters)
+            return cached_filters, False
+        
+        logger.info("🧠 Stage 1: Parsing query with %s", PARSER_MODEL)
         
-        prompt = f"""Parse this soccer query into simple filter criteria. 
-Extract ONLY what's explicitly mentioned. Return simple key-value pairs, no JSON.
-
-Query: "{query}"
-
-Extract these if mentioned:
-- position: MUST be one of: "Midfielder", "Forward", "Defender", "Goalkeeper"
-  (Map common terms: DM/CDM/CM/CAM → Midfielder, ST/CF/Winger → Forward, CB/LB/RB → Defender, GK → Goalkeeper)
-  
-- league: MUST be one of: "ENG-Premier League", "ESP-La Liga", "ITA-Serie A", "GER-Bundesliga", "FRA-Ligue 1"
-  (Map variations: England/EPL/Prem → ENG-Premier League, Spain → ESP-La Liga, Italy → ITA-Serie A, 
-   Germany/Buli → GER-Bundesliga, France/L1 → FRA-Ligue 1)
-  
-- age_max: (number - for "under X", "U21", "young")
-- age_min: (number - for "over X", "veteran")
-- min_minutes: (number, default 500 if not specified)
-- style: (creative, defensive, fast)
-- similar_to: (exact player name if comparing)
-
-Example output:
-position: Midfielder
-league: FRA-Ligue 1
-age_max: 21
-style: defensive
-
-Only include fields that are clearly mentioned in the query."""
-
         try:
             response = self.client.chat.completions.create(
-                model="gpt-3.5-turbo",
+                model=PARSER_MODEL,
                 messages=[
-                    {"role": "system", "content": "You are a query parser. Extract filter criteria from soccer queries. Return simple key-value pairs."},
-                    {"role": "user", "content": prompt}
+                    {"role": "system", "content": PARSER_SYSTEM_PROMPT},
+                    {"role": "user", "content": f'Query: "{query}"'}
                 ],
                 temperature=0.1,
-                max_tokens=200,
+                max_tokens=80,  # at most seven short key: value lines
                 timeout=5.0  # Fast timeout for parser
             )
             
@@ -168,284 +438,245 @@ Only include fields that are clearly mentioned in the query."""
             if 'min_minutes' not in filters:
                 filters['min_minutes'] = 500
                 
-            logger.info(f"✅ Parsed filters: {filters}")
-            return filters
+            logger.info("✅ Parsed filters: %s", filters)
+            with self.cache_lock:
+                self.parser_cache[cache_key] = filters
+                if len(self.parser_cache) > PARSER_CACHE_SIZE:
+                    self.parser_cache.popitem(last=False)
+            return filters, False
             
         except Exception as e:
-            logger.error(f"❌ OpenAI API call failed (gpt-3.5-turbo): {e}")
-            logger.warning(f"⚠️ Using fallback parser instead")
-            return self._fallback_parser(query)
+            logger.error("❌ OpenAI API call failed (%s): %s", PARSER_MODEL, e)
+            logger.warning("⚠️ Using fallback parser instead")
+            return keyword_filters, True
     
-    def _get_position_mapping(self):
-        """Comprehensive position mappings"""
-        return {
-            # Midfielders
-            'midfielder': 'Midfielder',
-            'midfield': 'Midfielder',
-            'mid': 'Midfielder',
-            'cm': 'Midfielder',
-            'cdm': 'Midfielder',
-            'cam': 'Midfielder',
-            'dm': 'Midfielder',
-            'defensive midfielder': 'Midfielder',
-            'attacking midfielder': 'Midfielder',
-            'central midfielder': 'Midfielder',
-            'box to box': 'Midfielder',
-            'playmaker': 'Midfielder',
-            
-            # Forwards
-            'forward': 'Forward',
-            'striker': 'Forward',
-            'attacker': 'Forward',
-            'cf': 'Forward',
-            'st': 'Forward',
-            'winger': 'Forward',
-            'wing': 'Forward',
-            'lw': 'Forward',
-            'rw': 'Forward',
-            'left winger': 'Forward',
-            'right winger': 'Forward',
-            
-            # Defenders
-            'defender': 'Defender',
-            'defense': 'Defender',
-            'defence': 'Defender',
-            'cb': 'Defender',
-            'center back': 'Defender',
-            'centre back': 'Defender',
-            'fullback': 'Defender',
-            'full back': 'Defender',
-            'lb': 'Defender',
-            'rb': 'Defender',
-            'left back': 'Defender',
-            'right back': 'Defender',
-            'wing back': 'Defender',
-            'wingback': 'Defender',
-            
-            # Goalkeeper
-            'goalkeeper': 'Goalkeeper',
-            'keeper': 'Goalkeeper',
-            'gk': 'Goalkeeper',
-            'goalie': 'Goalkeeper'
-        }
+    def _needs_ai_parser(self, query: str, keyword_filters: Dict[str, Any]) -> bool:
+        """
+        Score query complexity and escalate to the LLM parser only above a threshold.
+        Short queries the keyword parser resolves to a position or league stay local,
+        unless they hold a constraint the keyword parser would drop or misread.
+        """
+        normalized = self._normalize_query(query)
+        if self._has_unparsed_constraints(normalized):
+            return True
+        
+        words = normalized.split()
+        resolved = 'position' in keyword_filters or 'league' in keyword_filters
+        score = (
+            0.4 * (len(words) > 12)
+            + 0.4 * any(word in TACTICAL_KEYWORDS for word in words)
+            + 0.2 * (not resolved)
+        )
+        return score >= AI_PARSER_THRESHOLD
     
-    def _get_league_mapping(self):
-        """Comprehensive league mappings"""
-        return {
-            # Premier League variations
-            'premier league': 'ENG-Premier League',
-            'epl': 'ENG-Premier League',
-            'pl': 'ENG-Premier League',
-            'england': 'ENG-Premier League',
-            'english': 'ENG-Premier League',
-            'prem': 'ENG-Premier League',
-            
-            # La Liga variations
-            'la liga': 'ESP-La Liga',
-            'laliga': 'ESP-La Liga',
-            'spain': 'ESP-La Liga',
-            'spanish': 'ESP-La Liga',
-            'liga': 'ESP-La Liga',
-            
-            # Serie A variations
-            'serie a': 'ITA-Serie A',
-            'seriea': 'ITA-Serie A',
-            'italy': 'ITA-Serie A',
-            'italian': 'ITA-Serie A',
-            'serie': 'ITA-Serie A',
-            
-            # Bundesliga variations
-            'bundesliga': 'GER-Bundesliga',
-            'germany': 'GER-Bundesliga',
-            'german': 'GER-Bundesliga',
-            'buli': 'GER-Bundesliga',
-            
-            # Ligue 1 variations
-            'ligue 1': 'FRA-Ligue 1',
-            'ligue1': 'FRA-Ligue 1',
-            'france': 'FRA-Ligue 1',
-            'french': 'FRA-Ligue 1',
-            'ligue': 'FRA-Ligue 1',
-            'l1': 'FRA-Ligue 1'
-        }
+    @classmethod
+    def _has_unparsed_constraints(cls, normalized: str) -> bool:
+        """
+        Whether a normalised query holds constraints the keyword parser cannot
+        capture: comparison characters, negations, playing-time or age words,
+        more than one league, or numbers other than the age clause and league names
+        """
+        if UNPARSED_CONSTRAINT_PATTERN.search(normalized):
+            return True
+        
+        padded_query = f" {normalized} "
+        leagues = {value for term, value in LEAGUE_TERMS.items()
+                   if f" {term} " in padded_query or f" {term}s " in padded_query}
+        if len(leagues) > 1:
+            return True
+        
+        age = cls._match_age(normalized)
+        if age is not None:
+            match = age[0]
+            padded_query = f" {normalized[:match.start()]} {normalized[match.end():]} "
+        for term in NUMBERED_LEAGUE_TERMS:
+            padded_query = padded_query.replace(f" {term} ", " ")
+        return STRAY_NUMBER_PATTERN.search(padded_query) is not None
+    
+    @staticmethod
+    def _match_age(normalized: str) -> Optional[Tuple[Any, str, int]]:
+        """First age clause in a normalised query as (match, filter type, age), or None"""
+        for pattern, age_type in AGE_PATTERNS:
+            for match in pattern.finditer(normalized):
+                age = int(match.group(1))
+                if age <= MAX_QUERY_AGE:
+                    return match, age_type, age
+        return None
     
     def _fallback_parser(self, query: str) -> Dict[str, Any]:
         """Simple regex-based fallback parser with comprehensive mappings"""
         filters = {'min_minutes': 500}
-        query_lower = query.lower()
+        # Parse the same normalised text the cache key is built from, so
+        # queries that share a cached result always parse alike
+        query_lower = self._normalize_query(query)
+        # Whole-word view of the query so 'pl' does not match "players"
+        padded_query = f" {query_lower} "
         
         # Position detection with comprehensive mapping
-        positions = self._get_position_mapping()
-        for term, position in positions.items():
-            if term in query_lower:
-                filters['position'] = position
-                break
+        position = self._match_term(POSITION_TERMS, padded_query)
+        if position:
+            filters['position'] = position
         
         # League detection with comprehensive mapping
-        leagues = self._get_league_mapping()
-        for term, league in leagues.items():
-            if term in query_lower:
-                filters['league'] = league
-                break
+        league = self._match_term(LEAGUE_TERMS, padded_query)
+        if league:
+            filters['league'] = league
         
         # Age detection - multiple patterns
-        age_patterns = [
-            (r'under (\d+)', 'age_max'),
-            (r'u(\d+)', 'age_max'),
-            (r'younger than (\d+)', 'age_max'),
-            (r'over (\d+)', 'age_min'),
-            (r'older than (\d+)', 'age_min'),
-            (r'(\d+) years old', 'age_exact'),
-            (r'age (\d+)', 'age_exact')
-        ]
-        
-        for pattern, age_type in age_patterns:
-            match = re.search(pattern, query_lower)
-            if match:
-                age = int(match.group(1))
-                if age_type == 'age_exact':
-                    filters['age_min'] = age - 1
-                    filters['age_max'] = age + 1
-                else:
-                    filters[age_type] = age
-                break
+        age_clause = self._match_age(query_lower)
+        if age_clause is not None:
+            _, age_type, age = age_clause
+            if age_type == 'age_exact':
+                filters['age_min'] = age - 1
+                filters['age_max'] = age + 1
+            else:
+                filters[age_type] = age
         
         # Style detection
-        style_mappings = {
-            'creative': 'creative',
-            'playmaker': 'creative',
-            'technical': 'creative',
-            'defensive': 'defensive',
-            'destroyer': 'defensive',
-            'physical': 'defensive',
-            'fast': 'fast',
-            'pace': 'fast',
-            'quick': 'fast',
-            'speedy': 'fast'
-        }
-        
-        for term, style in style_mappings.items():
-            if term in query_lower:
-                filters['style'] = style
-                break
+        style = self._match_term(STYLE_TERMS, padded_query)
+        if style:
+            filters['style'] = style
         
         # Young player detection
-        if any(word in query_lower for word in ['young', 'prospect', 'talent', 'wonderkid']):
+        if YOUNG_PATTERN.search(query_lower):
             if 'age_max' not in filters:
                 filters['age_max'] = 23
         
         # Similar player detection
-        similar_keywords = ['similar to', 'like', 'replacement for', 'alternative to']
-        for keyword in similar_keywords:
-            if keyword in query_lower:
-                # Extract player name after the keyword
-                pattern = f"{keyword}\\s+([\\w\\s]+?)(?:\\s+in\\s+|\\s+for\\s+|$)"
-                match = re.search(pattern, query_lower)
-                if match:
-                    player_name = match.group(1).strip()
-                    filters['similar_to'] = player_name
-                    break
+        for pattern in SIMILAR_PLAYER_PATTERNS:
+            # Extract player name after the keyword
+            match = pattern.search(query_lower)
+            if match:
+                filters['similar_to'] = match.group(1).strip()
+                break
             
         return filters
     
+    @staticmethod
+    def _match_term(mapping: Dict[str, Any], padded_query: str) -> Optional[Any]:
+        """Return the value of the first term found as whole words (or plural) in the query"""
+        for term, value in mapping.items():
+            if f" {term} " in padded_query or f" {term}s " in padded_query:
+                return value
+        return None
+    
     def filter_players(self, filters: Dict[str, Any]) -> pd.DataFrame:
         """
         Stage 2A: Filter player database using parsed criteria
         """
-        logger.info(f"🔍 Stage 2A: Filtering players with criteria: {filters}")
+        logger.info("🔍 Stage 2A: Filtering players with criteria: %s", filters)
         
-        filtered = self.players_df.copy()
-        initial_count = len(filtered)
+        players_df = self.players_df
+        initial_count = len(players_df)
         
-        # Apply position filter
-        if 'position' in filters:
-            filtered = filtered[filtered['position'].str.contains(filters['position'], case=False, na=False)]
-            logger.info(f"   Position filter '{filters['position']}': {len(filtered)} players")
+        # Filtering works on row positions and the few columns it reads;
+        # only the final candidates are materialised with every column
         
-        # Apply league filter
+        # Apply league filter first: it selects a precomputed bucket of rows,
+        # so every later filter only scans that league's players
+        rows = None
         if 'league' in filters:
-            filtered = filtered[filtered['league'] == filters['league']]
-            logger.info(f"   League filter '{filters['league']}': {len(filtered)} players")
+            rows = self.league_rows.get(filters['league'], np.empty(0, dtype=np.intp))
+            logger.info("   League filter '%s': %s players", filters['league'], len(rows))
+        
+        def column(name):
+            values = players_df[name].to_numpy()
+            return values if rows is None else values[rows]
+        
+        # Position, age and minutes conditions are ANDed into one mask over
+        # the column arrays, not applied as a chain of frame slices
+        mask = np.ones(initial_count if rows is None else len(rows), dtype=bool)
+        
+        # Apply position filter
+        if 'position' in filters:
+            position_hits = self.position_masks.get(filters['position'].lower())
+            if position_hits is None:
+                position_hits = position_mask(players_df['position'], filters['position'])
+            if rows is not None:
+                position_hits = position_hits[rows]
+            mask &= position_hits
+            logger.info("   Position filter '%s': %s players", filters['position'], np.count_nonzero(mask))
         
         # Apply age filters
+        ages = column('age')
         if 'age_max' in filters:
-            filtered = filtered[filtered['age'] <= filters['age_max']]
-            logger.info(f"   Age <= {filters['age_max']}: {len(filtered)} players")
+            mask &= ages <= filters['age_max']
+            logger.info("   Age <= %s: %s players", filters['age_max'], np.count_nonzero(mask))
             
         if 'age_min' in filters:
-            filtered = filtered[filtered['age'] >= filters['age_min']]
-            logger.info(f"   Age >= {filters['age_min']}: {len(filtered)} players")
+            mask &= ages >= filters['age_min']
+            logger.info("   Age >= %s: %s players", filters['age_min'], np.count_nonzero(mask))
         
         # Apply minutes filter
         min_minutes = filters.get('min_minutes', 500)
-        filtered = filtered[filtered['minutes'] >= min_minutes]
-        logger.info(f"   Minutes >= {min_minutes}: {len(filtered)} players")
+        mask &= column('minutes') >= min_minutes
+        positions = np.flatnonzero(mask) if rows is None else rows[mask]
+        logger.info("   Minutes >= %s: %s players", min_minutes, len(positions))
         
         # Apply style filters
         if 'style' in filters:
             style = filters['style'].lower()
-            if style == 'creative':
-                # Filter for creative players (high creativity score)
-                threshold = filtered['creativity_score'].quantile(0.6)
-                filtered = filtered[filtered['creativity_score'] > threshold]
-            elif style == 'defensive':
-                # Filter for defensive players
-                threshold = filtered['defensive_work_rate'].quantile(0.6)
-                filtered = filtered[filtered['defensive_work_rate'] > threshold]
-            logger.info(f"   Style '{style}': {len(filtered)} players")
-        
-        # Sort by overall rating
-        filtered = filtered.sort_values('overall_rating', ascending=False)
+            score_column = STYLE_SCORE_COLUMNS.get(style)
+            if score_column:
+                # Keep players in the top 40% of the style's score
+                scores = players_df[score_column].to_numpy()[positions]
+                threshold = pd.Series(scores).quantile(0.6)
+                positions = positions[scores > threshold]
+            logger.info("   Style '%s': %s players", style, len(positions))
+        
+        # Already sorted by overall rating: players_df is kept in rating order
         
         # Limit to top 50 players for AI processing
-        if len(filtered) > 50:
-            filtered = filtered.head(50)
-            logger.info(f"   Limited to top 50 players by rating")
+        if len(positions) > 50:
+            positions = positions[:50]
+            logger.info("   Limited to top 50 players by rating")
         
-        logger.info(f"✅ Filtered from {initial_count} to {len(filtered)} players")
+        filtered = players_df.iloc[positions]
+        logger.info("✅ Filtered from %s to %s players", initial_count, len(filtered))
         return filtered
     
-    def generate_scout_analysis(self, query: str, players_df: pd.DataFrame, filters: Dict) -> str:
+    def generate_scout_analysis(self, query: str, players_df: pd.DataFrame,
+                                filters: Dict) -> Tuple[str, bool]:
         """
-        Stage 2B: Use GPT-5-mini to generate conversational scout analysis
-        No JSON parsing - just natural language response
+        Stage 2B: Use ANALYSIS_MODEL to generate conversational scout analysis
+        No JSON parsing - just natural language response, plus whether it is
+        the template fallback written because the LLM call failed
         """
-        logger.info(f"🎯 Stage 2B: Generating scout analysis with GPT-5-mini")
-        
-        # Prepare player summaries for AI
-        player_summaries = []
-        for _, player in players_df.head(15).iterrows():  # Top 15 players
-            summary = (
-                f"{player['player']} ({player['team']}, {player['league']}) - "
-                f"{player['position']}, Age {int(player['age'])}, "
-                f"{int(player['minutes'])} mins, "
-                f"{player.get('goals_per_90', 0):.2f} goals/90, "
-                f"{player.get('assists_per_90', 0):.2f} assists/90"
+        logger.info("🎯 Stage 2B: Generating scout analysis with %s", ANALYSIS_MODEL)
+        
+        # Prepare player summaries for AI from column arrays of the top 15
+        # players rather than building a Series per row
+        top = players_df.head(15)
+        player_summaries = [
+            f"{name} ({team}, {league}) - "
+            f"{position}, Age {age}, "
+            f"{minutes} mins, "
+            f"{goals} goals/90, "
+            f"{assists} assists/90"
+            for name, team, league, position, age, minutes, goals, assists in zip(
+                top['player'].to_numpy(), top['team'].to_numpy(),
+                top['league'].to_numpy(), top['position'].to_numpy(),
+                self._column_labels(top, 'age', '.0f'),
+                self._column_labels(top, 'minutes', '.0f'),
+                self._column_labels(top, 'goals_per_90', '.2f'),
+                self._column_labels(top, 'assists_per_90', '.2f')
             )
-            player_summaries.append(summary)
+        ]
         
         players_text = "\n".join(player_summaries)
         
-        prompt = f"""You are an expert soccer scout. Analyze these players for the following query:
+        prompt = f"""Analyze these players for the following query:
 
 Query: "{query}"
 
 Top candidates found:
-{players_text}
-
-Provide a conversational response that:
-1. Directly answers the user's question
-2. Recommends the top 2-3 players with brief reasoning
-3. Mentions any standout insights or concerns
-4. Keeps it concise and professional
-
-Do not use JSON or structured formats. Write naturally as if talking to a coach."""
+{players_text}"""
 
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4o-mini",
+                model=ANALYSIS_MODEL,
                 messages=[
-                    {"role": "system", "content": "You are a professional soccer scout providing clear, concise analysis."},
+                    {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.7,
@@ -455,12 +686,12 @@ Do not use JSON or structured formats. Write naturally as if talking to a coach.
             
             analysis = response.choices[0].message.content.strip()
             logger.info("✅ Scout analysis generated successfully")
-            return analysis
+            return analysis, False
             
         except Exception as e:
-            logger.error(f"❌ OpenAI API call failed (gpt-4o-mini): {e}")
-            logger.warning(f"⚠️ Using fallback analysis instead")
-            return self._fallback_analysis(query, players_df, filters)
+            logger.error("❌ OpenAI API call failed (%s): %s", ANALYSIS_MODEL, e)
+            logger.warning("⚠️ Using fallback analysis instead")
+            return self._fallback_analysis(query, players_df, filters), True
     
     def _fallback_analysis(self, query: str, players_df: pd.DataFrame, filters: Dict) -> str:
         """Simple fallback analysis when AI fails"""
@@ -468,32 +699,146 @@ Do not use JSON or structured formats. Write naturally as if talking to a coach.
             return "No players found matching your criteria. Try broadening your search."
         
         top_players = players_df.head(3)
-        response = f"Based on your search for {filters.get('position', 'players')}"
         
+        # Collect the pieces and join once instead of re-building the
+        # response string on every append
+        header = [f"Based on your search for {filters.get('position', 'players')}"]
         if 'league' in filters:
-            response += f" in {filters['league']}"
+            header.append(f" in {filters['league']}")
         if 'age_max' in filters:
-            response += f" under {filters['age_max']}"
-        
-        response += f", here are the top {len(top_players)} candidates:\n\n"
+            header.append(f" under {filters['age_max']}")
+        header.append(f", here are the top {len(top_players)} candidates:\n\n")
         
-        for _, player in top_players.iterrows():
-            response += (
-                f"• {player['player']} ({player['team']}) - "
-                f"{player['position']}, {int(player['age'])} years old, "
-                f"{player.get('goals_per_90', 0):.2f} goals/90, "
-                f"{player.get('assists_per_90', 0):.2f} assists/90\n"
+        # Convert the numeric columns in bulk rather than boxing each cell
+        lines = [
+            f"• {name} ({team}) - "
+            f"{position}, {'age n/a' if age == 'n/a' else f'{age} years old'}, "
+            f"{goals} goals/90, "
+            f"{assists} assists/90\n"
+            for name, team, position, age, goals, assists in zip(
+                top_players['player'].to_numpy(), top_players['team'].to_numpy(),
+                top_players['position'].to_numpy(),
+                self._column_labels(top_players, 'age', '.0f'),
+                self._column_labels(top_players, 'goals_per_90', '.2f'),
+                self._column_labels(top_players, 'assists_per_90', '.2f')
             )
+        ]
         
-        return response
+        return "".join(header + lines)
+    
+    @staticmethod
+    def _normalize_query(query: str) -> str:
+        """
+        Lowercased words of a query, ignoring punctuation and whitespace differences.
+        Comparison characters are kept as tokens, so "<21" and ">21" stay distinct.
+        """
+        return " ".join(QUERY_TOKEN_PATTERN.findall(query.lower()))
+    
+    @classmethod
+    def _cache_key(cls, query: str) -> str:
+        """Fixed-size cache key over the normalised query"""
+        normalized = cls._normalize_query(query)
+        return hashlib.blake2b(normalized.encode('utf-8'), digest_size=16).hexdigest()
+    
+    def _get_cached_result(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Return an unexpired cached analysis and mark it as most recently used"""
+        with self.cache_lock:
+            return self._cached_result_locked(cache_key)
+    
+    def _cached_result_locked(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """_get_cached_result for callers that already hold cache_lock"""
+        entry = self.result_cache.get(cache_key)
+        if entry is None:
+            return None
+        expires_at, result = entry
+        if time.monotonic() >= expires_at:
+            del self.result_cache[cache_key]
+            return None
+        self.result_cache.move_to_end(cache_key)
+        return result
+    
+    def _cache_result(self, cache_key: str, result: Dict[str, Any], degraded: bool = False):
+        """Store an analysis until its TTL, evicting the least recently used beyond the limit"""
+        # Failures and fallback answers expire quickly so a short OpenAI
+        # outage does not pin them in the cache
+        if result["success"] and not degraded:
+            ttl = RESULT_CACHE_TTL
+        else:
+            ttl = FAILED_RESULT_CACHE_TTL
+        with self.cache_lock:
+            self.result_cache[cache_key] = (time.monotonic() + ttl, result)
+            self.result_cache.move_to_end(cache_key)
+            if len(self.result_cache) > RESULT_CACHE_SIZE:
+                self.result_cache.popitem(last=False)
     
     def analyze(self, query: str) -> Dict[str, Any]:
         """Main analysis pipeline"""
+        trivial = self._trivial_response(query)
+        if trivial is not None:
+            return trivial
+        
+        cache_key = self._cache_key(query)
+        cached = self._get_cached_result(cache_key)
+        if cached is not None:
+            logger.info("⚡ Serving cached analysis")
+            return cached
+        
+        # Identical queries arriving together share one pipeline run. A
+        # leader may have cached its result and left in_flight since the
+        # lookup above, so check the cache again before starting a new run.
+        with self.cache_lock:
+            cached = self._cached_result_locked(cache_key)
+            if cached is None:
+                pending = self.in_flight.get(cache_key)
+                is_leader = pending is None
+                if is_leader:
+                    pending = self.in_flight[cache_key] = Future()
+        
+        if cached is not None:
+            logger.info("⚡ Serving cached analysis")
+            return cached
+        
+        if not is_leader:
+            logger.info("⏳ Waiting for identical in-flight analysis")
+            return pending.result()
+        
+        try:
+            result, degraded = self._run_analysis(query, cache_key)
+            self._cache_result(cache_key, result, degraded)
+            pending.set_result(result)
+            return result
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self.cache_lock:
+                del self.in_flight[cache_key]
+    
+    @staticmethod
+    def _trivial_response(query: str) -> Optional[Dict[str, Any]]:
+        """Canned reply for queries with no words to search on, skipping the pipeline"""
+        if re.search(r'\w', query):
+            return None
+        return {
+            "success": False,
+            "response_text": "Please describe the players you're looking for, e.g. 'young midfielders in the Premier League'.",
+            "recommendations": [],
+            "summary": "Empty query",
+            "execution_time": 0.0
+        }
+    
+    def _run_analysis(self, query: str,
+                      cache_key: Optional[str] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run the parse → filter → analysis stages for a query
+        Returns the result and whether any stage fell back after an LLM failure
+        """
         start_time = time.time()
+        degraded = False
         
         try:
             # Stage 1: Parse query to filters
-            filters = self.parse_query_to_filters(query)
+            filters, degraded = self.parse_query_to_filters(query, cache_key)
             
             # Stage 2A: Filter players
             filtered_players = self.filter_players(filters)
@@ -505,10 +850,11 @@ Do not use JSON or structured formats. Write naturally as if talking to a coach.
                     "recommendations": [],
                     "summary": "No matches found",
                     "execution_time": time.time() - start_time
-                }
+                }, degraded
             
             # Stage 2B: Generate analysis
-            analysis = self.generate_scout_analysis(query, filtered_players, filters)
+            analysis, analysis_degraded = self.generate_scout_analysis(query, filtered_players, filters)
+            degraded = degraded or analysis_degraded
             
             # Extract recommendations from the analysis
             recommendations = self._extract_recommendations(analysis, filtered_players)
@@ -523,33 +869,36 @@ Do not use JSON or structured formats. Write naturally as if talking to a coach.
                     "players_found": len(filtered_players),
                     "execution_time": round(time.time() - start_time, 2)
                 }
-            }
+            }, degraded
             
         except Exception as e:
-            logger.error(f"Analysis failed: {e}")
+            logger.error("Analysis failed: %s", e)
             return {
                 "success": False,
                 "response_text": f"Analysis failed: {str(e)}",
                 "recommendations": [],
                 "summary": "Error occurred",
                 "execution_time": time.time() - start_time
-            }
+            }, degraded
     
     def _extract_recommendations(self, analysis: str, players_df: pd.DataFrame) -> List[Dict]:
         """Extract player recommendations from analysis text"""
         recommendations = []
         
         # Simple extraction: look for player names from our filtered list
-        for _, player in players_df.head(5).iterrows():
+        columns = ['player', 'team', 'league', 'position', 'age',
+                   'goals_per_90', 'assists_per_90', 'minutes']
+        top_players = players_df.head(5).reindex(columns=columns, fill_value=0)
+        for player in top_players.to_dict('records'):
             if player['player'] in analysis:
                 recommendations.append({
                     "player": player['player'],
                     "team": player['team'],
                     "league": player['league'],
                     "position": player['position'],
-                    "age": int(player['age']),
-                    "goals_per_90": round(player.get('goals_per_90', 0), 2),
-                    "assists_per_90": round(player.get('assists_per_90', 0), 2),
+                    "age": int(player['age']) if pd.notna(player['age']) else None,
+                    "goals_per_90": round(player['goals_per_90'], 2),
+                    "assists_per_90": round(player['assists_per_90'], 2),
                     "minutes": int(player['minutes'])
                 })
         
@@ -574,7 +923,7 @@ def initialize_scout():
         logger.info("✅ Scout AI initialized successfully")
         return True
     except Exception as e:
-        logger.error(f"❌ Failed to initialize scout: {e}")
+        logger.error("❌ Failed to initialize scout: %s", e)
         return False
 
 
@@ -622,7 +971,7 @@ def chat():
         return jsonify(result)
         
     except Exception as e:
-        logger.error(f"Chat endpoint error: {e}")
+        logger.error("Chat endpoint error: %s", e)
         return jsonify({
             "success": False,
             "response_text": "An error occurred processing your request",
@@ -659,7 +1008,7 @@ def api_query():
         return jsonify(result)
         
     except Exception as e:
-        logger.error(f"API query endpoint error: {e}")
+        logger.error("API query endpoint error: %s", e)
         return jsonify({
             "success": False,
             "response_text": "An error occurred processing your request",
@@ -668,21 +1017,24 @@ def api_query():
         }), 500
 
 
+# Static part of the index response, built once
+API_INFO = {
+    "name": "Simple Scout API",
+    "version": "1.0.0",
+    "description": "Simplified two-stage AI soccer scout",
+    "endpoints": {
+        "POST /chat": "Main chat endpoint",
+        "POST /api/query": "Legacy query endpoint",
+        "GET /health": "Health check",
+        "GET /logs": "Recent logs (last 50 lines)"
+    }
+}
+
+
 @app.route('/', methods=['GET'])
 def index():
     """API information"""
-    return jsonify({
-        "name": "Simple Scout API",
-        "version": "1.0.0",
-        "description": "Simplified two-stage AI soccer scout",
-        "endpoints": {
-            "POST /chat": "Main chat endpoint",
-            "POST /api/query": "Legacy query endpoint",
-            "GET /health": "Health check",
-            "GET /logs": "Recent logs (last 50 lines)"
-        },
-        "status": "ready" if scout_initialized else "not_initialized"
-    })
+    return jsonify({**API_INFO, "status": "ready" if scout_initialized else "not_initialized"})
 
 
 # Keep recent logs in memory for quick access
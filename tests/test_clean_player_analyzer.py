@@ -17,7 +17,12 @@ import sys
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from analysis.clean_player_analyzer import CleanPlayerAnalyzer
-from analysis.utils import calculate_potential_score, filter_midfielders
+from analysis.utils import (
+    calculate_potential_score,
+    filter_midfielders,
+    position_mask,
+    top_n_positions,
+)
 
 
 class TestCleanPlayerAnalyzer:
@@ -78,6 +83,67 @@ class TestCleanPlayerAnalyzer:
             with pytest.raises(FileNotFoundError, match="Standard data file not found"):
                 CleanPlayerAnalyzer(data_dir=temp_dir)
     
+    def test_initialization_reuses_parquet_cache(self, temp_data_dir):
+        """Test that a second load reads the Parquet copy of the CSV."""
+        pytest.importorskip("pyarrow")
+        first = CleanPlayerAnalyzer(data_dir=temp_data_dir)
+        assert len(list(Path(temp_data_dir).glob('player_standard_clean.*.parquet'))) == 1
+        
+        second = CleanPlayerAnalyzer(data_dir=temp_data_dir)
+        pd.testing.assert_frame_equal(first.standard_data, second.standard_data)
+    
+    def test_initialization_ignores_stale_parquet_cache(self, temp_data_dir, sample_data):
+        """Test that a CSV newer than its Parquet copy is re-read."""
+        pytest.importorskip("pyarrow")
+        CleanPlayerAnalyzer(data_dir=temp_data_dir)
+        cache_path, = Path(temp_data_dir).glob('player_standard_clean.*.parquet')
+        csv_path = Path(temp_data_dir) / 'player_standard_clean.csv'
+        
+        sample_data.head(2).to_csv(csv_path)
+        cache_mtime = cache_path.stat().st_mtime
+        os.utime(csv_path, (cache_mtime + 10, cache_mtime + 10))
+        
+        analyzer = CleanPlayerAnalyzer(data_dir=temp_data_dir)
+        assert len(analyzer.standard_data) == 2
+    
+    def test_initialization_ignores_parquet_cache_from_older_loader(self, temp_data_dir):
+        """Test that a cache written without the current prepare step is not reused."""
+        pytest.importorskip("pyarrow")
+        csv_path = Path(temp_data_dir) / 'player_standard_clean.csv'
+        raw = pd.read_csv(csv_path, index_col=[0, 1, 2, 3])
+        legacy_path = Path(temp_data_dir) / 'player_standard_clean.parquet'
+        raw.to_parquet(legacy_path)
+        
+        analyzer = CleanPlayerAnalyzer(data_dir=temp_data_dir)
+        assert isinstance(analyzer.standard_data['position'].dtype, pd.CategoricalDtype)
+        assert not legacy_path.exists()
+    
+    def test_initialization_ignores_parquet_cache_after_version_bump(self, temp_data_dir, monkeypatch):
+        """Test that bumping the cache version replaces the old cache with a fresh one."""
+        pytest.importorskip("pyarrow")
+        first = CleanPlayerAnalyzer(data_dir=temp_data_dir)
+        old_cache, = Path(temp_data_dir).glob('player_standard_clean.*.parquet')
+        monkeypatch.setattr('analysis.utils.CSV_CACHE_VERSION', 2)
+        
+        second = CleanPlayerAnalyzer(data_dir=temp_data_dir)
+        new_cache, = Path(temp_data_dir).glob('player_standard_clean.*.parquet')
+        assert new_cache != old_cache
+        pd.testing.assert_frame_equal(first.standard_data, second.standard_data)
+    
+    def test_initialization_leaves_no_partial_parquet_cache(self, temp_data_dir, monkeypatch):
+        """Test that a failed cache write leaves neither a cache nor a temp file."""
+        pytest.importorskip("pyarrow")
+        
+        def failing_to_parquet(self, path, *args, **kwargs):
+            Path(path).write_bytes(b'PAR1 truncated')
+            raise OSError("disk full")
+        
+        monkeypatch.setattr(pd.DataFrame, 'to_parquet', failing_to_parquet)
+        analyzer = CleanPlayerAnalyzer(data_dir=temp_data_dir)
+        
+        assert len(analyzer.standard_data) == 5
+        assert sorted(p.name for p in Path(temp_data_dir).iterdir()) == ['player_standard_clean.csv']
+    
     def test_search_players_found(self, temp_data_dir):
         """Test searching for players that exist."""
         analyzer = CleanPlayerAnalyzer(data_dir=temp_data_dir)
@@ -120,6 +186,17 @@ class TestCleanPlayerAnalyzer:
         assert len(result) == 3  # Only players with 2000+ minutes
         assert all(result['minutes'] >= 2000)
     
+    def test_search_players_combined_filters(self, temp_data_dir):
+        """Test that position and minutes filters apply together."""
+        analyzer = CleanPlayerAnalyzer(data_dir=temp_data_dir)
+        expected = analyzer.search_players("Test Player", position="Midfielder")
+        expected = expected[expected['minutes'] >= 2000]
+        result = analyzer.search_players(
+            "Test Player", position="Midfielder", min_minutes=2000
+        )
+        
+        pd.testing.assert_frame_equal(result, expected)
+    
     def test_compare_players_success(self, temp_data_dir):
         """Test successful player comparison."""
         analyzer = CleanPlayerAnalyzer(data_dir=temp_data_dir)
@@ -182,6 +259,15 @@ class TestCleanPlayerAnalyzer:
         assert all(result['minutes'] >= 1000)
         assert 'potential_score' in result.columns
     
+    def test_initialization_downcasts_dtypes(self, temp_data_dir):
+        """Test that numeric columns are narrowed and position is categorical."""
+        analyzer = CleanPlayerAnalyzer(data_dir=temp_data_dir)
+        dtypes = analyzer.standard_data.dtypes
+        
+        assert dtypes['goals_per_90'] == np.float32
+        assert dtypes['minutes'].itemsize < 8
+        assert isinstance(dtypes['position'], pd.CategoricalDtype)
+    
     def test_data_summary(self, temp_data_dir):
         """Test data summary property."""
         analyzer = CleanPlayerAnalyzer(data_dir=temp_data_dir)
@@ -283,6 +369,22 @@ class TestUtilityFunctions:
         assert len(result) == 1  # Second midfielder meets attacking criteria
         assert (result.iloc[0]['goals_per_90'] >= 0.20) or (result.iloc[0]['assists_per_90'] >= 0.25)
     
+    def test_position_mask_categorical_matches_object(self):
+        """Test that categorical positions match like plain strings."""
+        positions = pd.Series(['Midfielder', 'Forward/Midfielder', None, 'Defender'])
+        
+        expected = [True, True, False, False]
+        assert position_mask(positions, 'midfielder').tolist() == expected
+        assert position_mask(positions.astype('category'), 'midfielder').tolist() == expected
+    
+    def test_top_n_positions(self):
+        """Test partial top-n selection ordering and NaN handling."""
+        values = np.array([3.0, np.nan, 7.0, 1.0, 5.0])
+        
+        assert top_n_positions(values, 3).tolist() == [2, 4, 0]
+        assert top_n_positions(values, 10).tolist() == [2, 4, 0, 3, 1]
+        assert top_n_positions(values, 0).tolist() == []
+    
     def test_filter_midfielders_conflicting_flags(self):
         """Test filtering with conflicting attacking/defensive flags."""
         data = pd.DataFrame({
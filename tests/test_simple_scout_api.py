@@ -0,0 +1,473 @@
+"""
+Unit tests for the SimpleScoutAI pipeline in simple_scout_api.
+
+The scout is built on a small in-memory player table instead of the
+unified CSV, and no test talks to OpenAI.
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Add the parent directory to sys.path to import the API module
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import simple_scout_api
+from simple_scout_api import SimpleScoutAI
+
+
+class FakeOpenAI:
+    """Stand-in OpenAI client whose parser and analysis calls can be made to fail."""
+
+    def __init__(self, parser_reply='position: Midfielder', fail_parser=False,
+                 fail_analysis=False):
+        self.parser_reply = parser_reply
+        self.fail_parser = fail_parser
+        self.fail_analysis = fail_analysis
+        self.calls = []
+        self.prompts = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        is_parser = messages[0]['content'] == simple_scout_api.PARSER_SYSTEM_PROMPT
+        self.calls.append('parser' if is_parser else 'analysis')
+        self.prompts.append(messages[-1]['content'])
+        if (self.fail_parser if is_parser else self.fail_analysis):
+            raise RuntimeError('OpenAI unavailable')
+        content = self.parser_reply if is_parser else 'Mid A is the standout option.'
+        message = SimpleNamespace(content=content)
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def cache_ttl(scout, query):
+    """Seconds until the cached analysis for a query expires."""
+    expires_at, _ = scout.result_cache[scout._cache_key(query)]
+    return expires_at - time.monotonic()
+
+
+class CountingRun:
+    """Replacement for SimpleScoutAI._run_analysis that records each run."""
+
+    def __init__(self, release=None, error=None):
+        self.queries = []
+        self.started = threading.Event()
+        self.release = release
+        self.error = error
+
+    def __call__(self, query, cache_key=None):
+        self.queries.append(query)
+        self.started.set()
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        return {'success': True, 'response_text': f'analysis of {query}'}, False
+
+
+@pytest.fixture
+def sample_players():
+    """Create a small unified player table."""
+    return pd.DataFrame({
+        'player': ['Mid A', 'Mid B', 'Fwd C', 'Def D', 'Mid E', 'Fwd F'],
+        'team': ['Arsenal', 'Barcelona', 'Chelsea', 'Inter', 'Bayern', 'PSG'],
+        'league': ['ENG-Premier League', 'ESP-La Liga', 'ENG-Premier League',
+                   'ITA-Serie A', 'GER-Bundesliga', 'FRA-Ligue 1'],
+        'position': ['Midfielder', 'Midfielder', 'Forward', 'Defender',
+                     'Forward/Midfielder', 'Forward'],
+        'age': [21, 27, 24, 31, 19, 22],
+        'minutes': [2400, 1800, 2700, 3000, 900, 300],
+        'goals_per_90': [0.20, 0.10, 0.60, 0.05, 0.30, 0.90],
+        'assists_per_90': [0.40, 0.30, 0.20, 0.02, 0.25, 0.10],
+        'expected_assists_per_90': [0.35, 0.20, 0.15, 0.03, 0.30, 0.10],
+        'tackles': [40, 60, 10, 80, 20, 5],
+        'tackles_won': [25, 40, 5, 55, 10, 2],
+        'nineties': [26.7, 20.0, 30.0, 33.3, 10.0, 3.3],
+    })
+
+
+@pytest.fixture
+def many_players():
+    """Create a larger random player table, enough to hit the top-50 limit."""
+    rng = np.random.default_rng(7)
+    count = 400
+    positions = ['Midfielder', 'Forward', 'Defender', 'Goalkeeper',
+                 'Forward/Midfielder', 'Defender/Midfielder', None]
+    leagues = ['ENG-Premier League', 'ESP-La Liga', 'ITA-Serie A',
+               'GER-Bundesliga', 'FRA-Ligue 1']
+    return pd.DataFrame({
+        'player': [f'Player {i}' for i in range(count)],
+        'team': [f'Team {i % 40}' for i in range(count)],
+        'league': rng.choice(leagues, count),
+        'position': rng.choice(np.array(positions, dtype=object), count),
+        'age': rng.integers(17, 36, count),
+        'minutes': rng.integers(0, 3400, count),
+        'goals_per_90': rng.random(count),
+        'assists_per_90': rng.random(count) * 0.6,
+        'expected_assists_per_90': rng.random(count) * 0.5,
+        'tackles': rng.integers(0, 100, count),
+        'tackles_won': rng.integers(0, 60, count),
+        'nineties': rng.random(count) * 38,
+    })
+
+
+def reference_filter(players, filters):
+    """Row-by-row filter_players from before the position-based rewrite."""
+    filtered = players.copy()
+    if 'position' in filters:
+        filtered = filtered[filtered['position'].str.contains(
+            filters['position'], case=False, na=False)]
+    if 'league' in filters:
+        filtered = filtered[filtered['league'] == filters['league']]
+    if 'age_max' in filters:
+        filtered = filtered[filtered['age'] <= filters['age_max']]
+    if 'age_min' in filters:
+        filtered = filtered[filtered['age'] >= filters['age_min']]
+    filtered = filtered[filtered['minutes'] >= filters.get('min_minutes', 500)]
+    if 'style' in filters:
+        column = {'creative': 'creativity_score',
+                  'defensive': 'defensive_work_rate'}.get(filters['style'])
+        if column:
+            filtered = filtered[filtered[column] > filtered[column].quantile(0.6)]
+    filtered = filtered.sort_values('overall_rating', ascending=False, kind='stable')
+    return filtered.head(50)
+
+
+@pytest.fixture
+def make_scout(monkeypatch):
+    """Build a SimpleScoutAI over a given player table."""
+    def build(players):
+        monkeypatch.setattr(simple_scout_api, 'load_csv_with_cache',
+                            lambda *args, **kwargs: players.copy())
+        return SimpleScoutAI(openai_api_key='sk-test')
+    return build
+
+
+class TestPlayerMetrics:
+    """Test cases for the metrics derived at load time."""
+
+    def test_missing_nineties_value_gives_zero_work_rate(self, make_scout, sample_players):
+        """Test that a NaN nineties value does not turn raw tackles into a rate."""
+        sample_players.loc[0, 'nineties'] = np.nan
+        scout = make_scout(sample_players)
+
+        player = scout.players_df.set_index('player').loc['Mid A']
+        assert player['defensive_work_rate'] == 0
+        assert player['overall_rating'] == pytest.approx(0.20 * 3 + 0.40 * 2)
+
+    def test_absent_nineties_column_divides_by_one(self, make_scout, sample_players):
+        """Test that without a nineties column tackles are used as-is."""
+        scout = make_scout(sample_players.drop(columns='nineties'))
+
+        player = scout.players_df.set_index('player').loc['Def D']
+        assert player['defensive_work_rate'] == pytest.approx(80 + 55)
+
+
+class TestAnalysisText:
+    """Test cases for the player lines in the prompt and the fallback analysis."""
+
+    def test_missing_per_90_values_read_not_available(self, make_scout, sample_players):
+        """Test that NaN per-90 stats are shown as n/a instead of nan."""
+        sample_players.loc[0, 'assists_per_90'] = np.nan
+        scout = make_scout(sample_players)
+        scout.client = FakeOpenAI()
+        players = scout.players_df[scout.players_df['player'] == 'Mid A']
+
+        scout.generate_scout_analysis('midfielders', players, {})
+        fallback = scout._fallback_analysis('midfielders', players, {})
+
+        assert '0.20 goals/90, n/a assists/90' in scout.client.prompts[-1]
+        assert '0.20 goals/90, n/a assists/90' in fallback
+
+    def test_missing_age_reads_not_available(self, make_scout, sample_players):
+        """Test that a player without an age is described, not given a bogus age."""
+        sample_players.loc[0, 'age'] = np.nan
+        scout = make_scout(sample_players)
+        scout.client = FakeOpenAI()
+
+        result = scout.analyze('midfielders in the premier league')
+
+        assert result['success']
+        assert 'Mid A (Arsenal, ENG-Premier League) - Midfielder, Age n/a, 2400 mins' \
+            in scout.client.prompts[-1]
+        assert result['recommendations'][0]['player'] == 'Mid A'
+        assert result['recommendations'][0]['age'] is None
+
+        players = scout.players_df[scout.players_df['player'] == 'Mid A']
+        fallback = scout._fallback_analysis('midfielders', players, {})
+        assert 'Mid A (Arsenal) - Midfielder, age n/a, ' in fallback
+
+
+class TestQueryParsing:
+    """Test cases for the keyword parser and LLM routing."""
+
+    @pytest.mark.parametrize('query, expected', [
+        ('midfielders in la liga',
+         {'position': 'Midfielder', 'league': 'ESP-La Liga'}),
+        ('bundesliga defenders',
+         {'position': 'Defender', 'league': 'GER-Bundesliga'}),
+        ('pl strikers', {'position': 'Forward', 'league': 'ENG-Premier League'}),
+        ('players in france', {'league': 'FRA-Ligue 1'}),
+        ('best players', {}),
+        ('best youngsters in serie a', {'league': 'ITA-Serie A', 'age_max': 23}),
+        ('talented wingers', {'position': 'Forward', 'age_max': 23}),
+        ('young prospects under 20', {'age_max': 20}),
+        ('u21 creative midfielders',
+         {'position': 'Midfielder', 'age_max': 21, 'style': 'creative'}),
+        ('defenders over 30', {'position': 'Defender', 'age_min': 30}),
+        ('U-21 midfielders', {'position': 'Midfielder', 'age_max': 21}),
+        # Minute and game counts are not ages
+        ('forwards over 2000 minutes', {'position': 'Forward'}),
+        ('wingers under 30 games', {'position': 'Forward'}),
+        ('strikers over 50', {'position': 'Forward'}),
+    ])
+    def test_fallback_parser(self, make_scout, sample_players, query, expected):
+        """Test keyword parsing of positions, leagues, ages and styles."""
+        scout = make_scout(sample_players)
+
+        assert scout._fallback_parser(query) == {'min_minutes': 500, **expected}
+
+    @pytest.mark.parametrize('query, needs_ai', [
+        # Resolved, short and not tactical: 0
+        ('midfielders in la liga', False),
+        # Unresolved only: 0.2
+        ('best players', False),
+        # Tactical but resolved: 0.4
+        ('pressing midfielder', False),
+        # Long but resolved: 0.4
+        ('i need a really good and reliable midfielder who scores goals '
+         'and creates lots of chances', False),
+        # Tactical and unresolved: 0.6
+        ('players who press high', True),
+        # Long and unresolved: 0.6
+        ('who are the best young players right now that could become '
+         'world class in a few years', True),
+        # Long, tactical and resolved: 0.8
+        ('find me a midfielder who would fit a high pressing system and '
+         'can also create chances for others', True),
+        # Resolved, but with constraints the keyword parser cannot capture
+        ('forwards over 2000 minutes', True),
+        ('veteran defenders', True),
+        ('teenage midfielders', True),
+        ('midfielders aged 21', True),
+        ('defenders between 20 and 25', True),
+        ('strikers born after 2003', True),
+        ('goalkeepers outside the premier league', True),
+        ('wingers under 21 in ligue 1 or bundesliga', True),
+        ('pressing midfielders <21', True),
+        ('top 10 midfielders in serie a', True),
+        # Every number accounted for by an age clause or league name
+        ('midfielders under 21 in ligue 1', False),
+        ('u21 strikers in the bundesliga', False),
+        ('strikers 25 years old', False),
+    ])
+    def test_needs_ai_parser_threshold(self, make_scout, sample_players, query, needs_ai):
+        """Test that only queries scoring at the threshold go to the LLM."""
+        scout = make_scout(sample_players)
+
+        filters = scout._fallback_parser(query)
+        assert scout._needs_ai_parser(query, filters) is needs_ai
+
+    @pytest.mark.parametrize('query, variant', [
+        ('under 21 midfielders', 'under-21 midfielders'),
+        ('similar to de bruyne', 'Similar to De-Bruyne?'),
+        ('midfielders in la liga', 'Midfielders, in La Liga!'),
+        ('u21 strikers', 'U21   strikers'),
+        ('players who press high', 'Players who press... high?'),
+    ])
+    def test_queries_sharing_cache_key_parse_alike(self, make_scout, sample_players,
+                                                   query, variant):
+        """Test that queries with one cache key get the same filters and routing."""
+        scout = make_scout(sample_players)
+        scout.client = FakeOpenAI(fail_parser=True)
+
+        assert scout._cache_key(query) == scout._cache_key(variant)
+        assert scout.parse_query_to_filters(query) == scout.parse_query_to_filters(variant)
+
+    def test_comparison_operators_keep_queries_apart(self, make_scout, sample_players):
+        """Test that opposite age constraints do not share a parsed result."""
+        scout = make_scout(sample_players)
+        scout.client = FakeOpenAI()
+
+        keys = {scout._cache_key(query) for query in
+                ('players who press <21', 'players who press >21', 'players who press 21+')}
+        assert len(keys) == 3
+
+        scout.parse_query_to_filters('players who press <21')
+        scout.parse_query_to_filters('players who press >21')
+        assert scout.client.calls == ['parser', 'parser']
+        assert scout.client.prompts == ['Query: "players who press <21"',
+                                        'Query: "players who press >21"']
+
+
+class TestResultCache:
+    """Test cases for caching of full analyses."""
+
+    def test_successful_analysis_cached_for_full_ttl(self, make_scout, sample_players):
+        """Test that an analysis written by the LLM is kept for the full TTL."""
+        scout = make_scout(sample_players)
+        scout.client = FakeOpenAI()
+
+        result = scout.analyze('midfielders in la liga')
+
+        assert result['success']
+        assert cache_ttl(scout, 'midfielders in la liga') > simple_scout_api.FAILED_RESULT_CACHE_TTL
+
+    @pytest.mark.parametrize('query, failures', [
+        # Keyword-parsed query whose analysis call fails
+        ('midfielders in la liga', {'fail_analysis': True}),
+        # LLM-routed query whose parser call fails
+        ('players who press high', {'fail_parser': True}),
+    ])
+    def test_fallback_answers_cached_briefly(self, make_scout, sample_players, query, failures):
+        """Test that answers produced by a fallback path expire like failures."""
+        scout = make_scout(sample_players)
+        scout.client = FakeOpenAI(**failures)
+
+        result = scout.analyze(query)
+
+        assert result['success']
+        assert cache_ttl(scout, query) <= simple_scout_api.FAILED_RESULT_CACHE_TTL
+
+    def test_concurrent_identical_queries_run_once(self, make_scout, sample_players):
+        """Test that identical queries arriving together share one pipeline run."""
+        scout = make_scout(sample_players)
+        release = threading.Event()
+        run = scout._run_analysis = CountingRun(release=release)
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(scout.analyze('Young midfielders?')))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        assert run.started.wait(timeout=5)
+        time.sleep(0.05)  # let the other threads find the in-flight run
+        release.set()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert len(run.queries) == 1
+        assert len(results) == 8
+        assert all(result is results[0] for result in results)
+        assert scout.in_flight == {}
+
+    def test_query_missing_cache_as_leader_finishes_reuses_result(self, make_scout,
+                                                                   sample_players):
+        """Test that a stale cache miss does not start a second run once the leader is done."""
+        scout = make_scout(sample_players)
+        run = scout._run_analysis = CountingRun()
+        first = scout.analyze('young midfielders')
+
+        # The lookup ran just before the leader cached its result and left
+        # in_flight, so it saw neither
+        scout._get_cached_result = lambda cache_key: None
+        second = scout.analyze('young midfielders')
+
+        assert second is first
+        assert len(run.queries) == 1
+        assert scout.in_flight == {}
+
+    def test_failed_leader_clears_in_flight_entry(self, make_scout, sample_players):
+        """Test that a run which raises does not leave later queries waiting."""
+        scout = make_scout(sample_players)
+        run = scout._run_analysis = CountingRun(error=RuntimeError('boom'))
+
+        with pytest.raises(RuntimeError):
+            scout.analyze('young midfielders')
+        assert scout.in_flight == {}
+
+        with pytest.raises(RuntimeError):
+            scout.analyze('young midfielders')
+        assert len(run.queries) == 2
+
+    def test_cached_analysis_expires_after_ttl(self, make_scout, sample_players, monkeypatch):
+        """Test that an analysis is served from cache until its TTL passes."""
+        scout = make_scout(sample_players)
+        run = scout._run_analysis = CountingRun()
+        now = [1000.0]
+        monkeypatch.setattr(simple_scout_api.time, 'monotonic', lambda: now[0])
+
+        scout.analyze('young midfielders')
+        now[0] += simple_scout_api.RESULT_CACHE_TTL - 1
+        scout.analyze('young midfielders')
+        assert len(run.queries) == 1
+
+        now[0] += 1
+        scout.analyze('young midfielders')
+        assert len(run.queries) == 2
+
+    def test_opposite_age_constraints_cached_separately(self, make_scout, sample_players):
+        """Test that "<21" and ">21" queries never share a cached analysis."""
+        scout = make_scout(sample_players)
+        run = scout._run_analysis = CountingRun()
+
+        below = scout.analyze('pressing midfielders <21')
+        above = scout.analyze('pressing midfielders >21')
+
+        assert run.queries == ['pressing midfielders <21', 'pressing midfielders >21']
+        assert below['response_text'] != above['response_text']
+        assert scout.analyze('Pressing midfielders < 21')['response_text'] == below['response_text']
+        assert len(run.queries) == 2
+
+    def test_least_recently_used_analysis_evicted(self, make_scout, sample_players, monkeypatch):
+        """Test that the cache drops the least recently used analysis beyond its size."""
+        scout = make_scout(sample_players)
+        run = scout._run_analysis = CountingRun()
+        monkeypatch.setattr(simple_scout_api, 'RESULT_CACHE_SIZE', 2)
+
+        scout.analyze('first query')
+        scout.analyze('second query')
+        scout.analyze('first query')  # cache hit, now most recently used
+        scout.analyze('third query')  # evicts 'second query'
+        assert run.queries == ['first query', 'second query', 'third query']
+
+        scout.analyze('first query')
+        scout.analyze('second query')
+        assert run.queries == ['first query', 'second query', 'third query', 'second query']
+
+
+FILTER_CASES = [
+    {k: v for k, v in {'league': league, 'position': position, **rest}.items()
+     if v is not None}
+    for league, position, rest in itertools.product(
+        [None, 'ESP-La Liga', 'ENG-Premier League'],
+        # Canonical positions use precomputed masks, 'Mid' the fallback scan
+        [None, 'Midfielder', 'forward', 'Mid'],
+        [{},
+         {'age_max': 23, 'style': 'creative'},
+         {'age_min': 25, 'age_max': 30, 'style': 'defensive'},
+         {'min_minutes': 0, 'style': 'fast'}],
+    )
+]
+
+
+class TestFilterPlayers:
+    """Test cases for the filter stage."""
+
+    @pytest.mark.parametrize('filters', FILTER_CASES, ids=str)
+    def test_matches_row_wise_filtering(self, make_scout, many_players, filters):
+        """Test that filtering matches the original row-by-row implementation."""
+        scout = make_scout(many_players)
+
+        result = scout.filter_players(filters)
+        expected = reference_filter(scout.players_df, filters)
+
+        pd.testing.assert_frame_equal(result.reset_index(drop=True),
+                                      expected.reset_index(drop=True))
+
+    def test_unknown_league_returns_no_players(self, make_scout, sample_players):
+        """Test that a league outside the database yields an empty result."""
+        scout = make_scout(sample_players)
+
+        result = scout.filter_players({'league': 'USA-MLS'})
+
+        assert len(result) == 0
+        assert list(result.columns) == list(scout.players_df.columns)
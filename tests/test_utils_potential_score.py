@@ -1,7 +1,7 @@
 import pandas as pd
 import pytest
 
-from analysis.utils import calculate_potential_score
+from analysis.utils import calculate_potential_score, calculate_potential_scores
 
 
 def test_calculate_potential_score_separate_weights():
@@ -23,3 +23,22 @@ def test_calculate_potential_score_separate_weights():
     # 10*0.05 + 5*0.02 + 1000*0.002 + (23-20)*10 + 2*5 + 1*5 = 47.6
     assert score == pytest.approx(47.6)
 
+
+def test_calculate_potential_scores_matches_row_wise():
+    players = pd.DataFrame(
+        {
+            "age": [20, 23, 26],
+            "goals_per_90": [0.1, 0.2, 0.3],
+            "assists_per_90": [0.05, 0.1, 0.2],
+            "progressive_carries": [10, 40, 25],
+            "progressive_passes": [5, 80, 60],
+            "expected_goals": [2, 3.5, 6],
+            "expected_assists": [1, 2.2, 4],
+            "minutes": [1000, 2400, 3000],
+        }
+    )
+
+    scores = calculate_potential_scores(players)
+    expected = [calculate_potential_score(row) for _, row in players.iterrows()]
+
+    assert scores == pytest.approx(expected)